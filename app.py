@@ -1,16 +1,33 @@
 # MinIO Metrics Viewer
 # A simple web app to view storage metrics over time
+import asyncio
 import os
 import csv
+import heapq
 import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from functools import lru_cache
 from pathlib import Path
 from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
-import minio
 import uvicorn
+from minio_client import get_client
 
-app = FastAPI(title="MinIO Metrics Viewer")
+# minio-py is blocking, so endpoints run its calls on the event loop's default executor
+MAX_WORKERS = 32
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=MAX_WORKERS))
+    yield
+
+
+app = FastAPI(title="MinIO Metrics Viewer", lifespan=lifespan)
 
 # Serve static files
 static_dir = Path(__file__).parent / "static"
@@ -24,46 +41,129 @@ for var in required_config:
         raise EnvironmentError(f"Required environment variable {var} not set.")
 
 
-def get_s3_client():
-    return minio.Minio(
-        endpoint=os.environ["MINIO_ENDPOINT_URL"].replace("http://", "").replace("https://", ""),
-        access_key=os.environ["MINIO_ROOT_USER"],
-        secret_key=os.environ["MINIO_ROOT_PASSWORD"],
-        secure=os.environ["MINIO_ENDPOINT_URL"].startswith("https://"),
-    )
+# Metrics files are written at most daily, so a short-lived listing is fine to reuse
+METRICS_FILES_TTL_SECONDS = 60
+metrics_files_cache = {}
 
 
 def get_metrics_files(limit: int = 5):
-    """Get the most recent metrics files from MinIO."""
-    s3 = get_s3_client()
+    """Get the most recent metrics files, reusing a recent listing if there is one."""
+    cached = metrics_files_cache.get(limit)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    metrics_files = list_metrics_files(limit)
+    metrics_files_cache[limit] = (time.monotonic() + METRICS_FILES_TTL_SECONDS, metrics_files)
+    return metrics_files
+
+
+def list_csv_objects(s3, bucket_name: str, prefix: str):
+    """Yield the CSV objects under a prefix, at any depth."""
+    for obj in s3.list_objects(bucket_name, prefix=prefix, recursive=True, use_api_v1=False):
+        if obj.object_name.endswith('.csv'):
+            yield obj
+
+
+def list_metrics_files(limit: int = 5):
+    """List the most recent metrics files from MinIO."""
+    s3 = get_client()
     bucket_name = "cdm-lake"
     metrics_prefix = "metrics/"
 
-    metrics_files = []
-    for obj in s3.list_objects(bucket_name, prefix=metrics_prefix):
-        if obj.object_name.endswith('.csv'):
-            metrics_files.append({
-                'name': obj.object_name,
-                'last_modified': obj.last_modified.isoformat(),
-                'size': obj.size
-            })
+    # Reports are keyed by date (metrics/YYYY/MM/DD/), so the newest ones are
+    # almost always under this month or last month. Only fall back to listing
+    # everything, including reports from before the date layout, when those
+    # months don't hold enough files.
+    today = date.today()
+    last_month = today.replace(day=1) - timedelta(days=1)
+    csv_objects = [
+        obj for month in (today, last_month)
+        for obj in list_csv_objects(s3, bucket_name, f"{metrics_prefix}{month:%Y/%m}/")
+    ]
+    if len(csv_objects) < limit:
+        csv_objects = list_csv_objects(s3, bucket_name, metrics_prefix)
+
+    # Keep only the newest `limit` objects while streaming the listing
+    latest = heapq.nlargest(limit, csv_objects, key=lambda obj: obj.last_modified)
+
+    return [{
+        'name': obj.object_name,
+        'last_modified': obj.last_modified.isoformat(),
+        'size': obj.size
+    } for obj in latest]
 
-    metrics_files.sort(key=lambda x: x['last_modified'], reverse=True)
-    return metrics_files[:limit]
+
+CSV_READ_BLOCK_SIZE = 1 << 20
+
+# Large reports can be downloaded as parallel ranged GETs by setting MINIO_PARALLEL_GET=1
+PARALLEL_GET = os.environ.get("MINIO_PARALLEL_GET") == "1"
+PARALLEL_GET_THRESHOLD = 16 * 1024 * 1024
+PARALLEL_GET_CHUNK_SIZE = 5 * 1024 * 1024
+PARALLEL_GET_WORKERS = 8
+
+# Size columns are sent as numbers so the viewer never has to parse them itself
+NUMERIC_COLUMNS = {'size_bytes': int}
 
 
 def read_csv_from_minio(object_name: str):
-    """Read and parse a CSV file from MinIO."""
-    s3 = get_s3_client()
+    """Read and parse a CSV file from MinIO, reusing the parsed copy while its ETag is unchanged."""
+    s3 = get_client()
+    bucket_name = "cdm-lake"
+
+    stat = s3.stat_object(bucket_name, object_name)
+    return fetch_csv_from_minio(object_name, stat.etag, stat.size)
+
+
+# Reports are write-once, so a parsed copy stays valid for as long as its ETag does
+@lru_cache(maxsize=64)
+def fetch_csv_from_minio(object_name: str, etag: str, size: int):
+    """Download and parse a CSV file from MinIO into its header and row lists."""
+    if PARALLEL_GET and size > PARALLEL_GET_THRESHOLD:
+        offsets = range(0, size, PARALLEL_GET_CHUNK_SIZE)
+        with ThreadPoolExecutor(max_workers=PARALLEL_GET_WORKERS) as executor:
+            chunks = executor.map(
+                lambda offset: read_object_range(object_name, offset, min(PARALLEL_GET_CHUNK_SIZE, size - offset)),
+                offsets,
+            )
+            body = b"".join(chunks)
+        return parse_csv(io.BytesIO(body))
+
+    s3 = get_client()
     bucket_name = "cdm-lake"
 
     response = s3.get_object(bucket_name, object_name)
-    csv_content = response.read().decode('utf-8')
-    response.close()
-    response.release_conn()
+    try:
+        # Parse straight off the response stream instead of decoding the whole body first,
+        # pulling it from the socket in large blocks rather than 8 KiB reads
+        return parse_csv(io.BufferedReader(response, buffer_size=CSV_READ_BLOCK_SIZE))
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def read_object_range(object_name: str, offset: int, length: int):
+    """Download one byte range of an object from MinIO."""
+    s3 = get_client()
+    bucket_name = "cdm-lake"
+
+    response = s3.get_object(bucket_name, object_name, offset=offset, length=length)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
 
-    reader = csv.DictReader(io.StringIO(csv_content))
-    return list(reader)
+def parse_csv(stream):
+    """Parse a binary CSV stream into its header and row lists."""
+    reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    columns = next(reader, [])
+    converters = [NUMERIC_COLUMNS.get(column) for column in columns]
+    rows = [
+        [convert(value) if convert else value for convert, value in zip(converters, row)]
+        for row in reader
+    ]
+    return {"columns": columns, "rows": rows}
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -72,20 +172,21 @@ async def index():
     return HTMLResponse(content=html_path.read_text())
 
 
-@app.get("/api/csv")
+@app.get("/api/csv", response_class=JSONResponse)
 async def get_csv(file: str = Query(..., description="CSV filename to load")):
     if not file:
         raise HTTPException(status_code=400, detail="No file specified")
     try:
-        rows = read_csv_from_minio(file)
-        return {"rows": rows}
+        # The parsed CSV is plain strings and numbers already, so hand it straight to the JSON
+        # encoder rather than having FastAPI walk every cell through jsonable_encoder
+        return JSONResponse(await asyncio.to_thread(read_csv_from_minio, file))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/files")
 async def list_files(limit: int = Query(5, ge=1, le=20)):
-    files = get_metrics_files(limit=limit)
+    files = await asyncio.to_thread(get_metrics_files, limit)
     return {"files": files}
 
 
@@ -5,13 +5,15 @@ import os
 import csv
 import io
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import minio
+from minio_client import get_client
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
 # Start timing
-start_time = time.time()
+start_time = time.monotonic()
 
 required_config = ['MINIO_ROOT_USER', 'MINIO_ROOT_PASSWORD', "MINIO_ENDPOINT_URL", "SLACK_BOT_TOKEN", "QUOTA_GB"]
 
@@ -30,50 +32,45 @@ def format_size(size_bytes):
         return f"{size_mb:.2f} MB"
 
 
-s3 = minio.Minio(
-    endpoint=os.environ["MINIO_ENDPOINT_URL"].replace("http://", "").replace("https://", ""),
-    access_key=os.environ["MINIO_ROOT_USER"],
-    secret_key=os.environ["MINIO_ROOT_PASSWORD"],
-    secure=os.environ["MINIO_ENDPOINT_URL"].startswith("https://"),
-)
+# Bucket listings are latency bound, so size the buckets concurrently
+MAX_WORKERS = 16
+
+s3 = get_client()
+
+
+def bucket_size(name):
+    """Sum the sizes of all objects in a bucket."""
+    return sum(obj.size for obj in s3.list_objects(name, recursive=True, use_api_v1=False))
+
 
 # Collect bucket data
+bucket_names = [bucket.name for bucket in s3.list_buckets()]
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    bucket_sizes = dict(zip(bucket_names, executor.map(bucket_size, bucket_names)))
+
 bucket_data = []
-for bucket in s3.list_buckets():
-    bucket_size = 0
-    for obj in s3.list_objects(bucket.name, recursive=True):
-        bucket_size += obj.size
+for name, size in bucket_sizes.items():
+    size_human = format_size(size)
     bucket_data.append({
-        'path': bucket.name,
-        'size_bytes': bucket_size,
-        'size_human': format_size(bucket_size)
+        'path': name,
+        'size_bytes': size,
+        'size_human': size_human
     })
-    print(f"Bucket: {bucket.name}, Size: {format_size(bucket_size)}")
+    print(f"Bucket: {name}, Size: {size_human}")
 
 # Now get all directories and their sizes in the cdm-lake bucket (2 levels deep)
 bucket_name = "cdm-lake"
 
-# Collect all 2-level paths
-two_level_paths = set()
-for obj in s3.list_objects(bucket_name, recursive=True):
-    parts = obj.object_name.split('/')
-    if len(parts) >= 2:
-        two_level_path = f"{parts[0]}/{parts[1]}"
-    else:
-        two_level_path = parts[0]
-    two_level_paths.add(two_level_path)
-
-# Calculate sizes for each 2-level path
-path_sizes = {path: 0 for path in two_level_paths}
-for obj in s3.list_objects(bucket_name, recursive=True):
-    parts = obj.object_name.split('/')
+# Sum sizes for each 2-level path in a single pass over the bucket
+path_sizes = defaultdict(int)
+for obj in s3.list_objects(bucket_name, recursive=True, use_api_v1=False):
+    # Only the first two components are needed, so stop splitting after them
+    parts = obj.object_name.split('/', 2)
     if len(parts) >= 2:
         two_level_path = f"{parts[0]}/{parts[1]}"
     else:
         two_level_path = parts[0]
-
-    if two_level_path in path_sizes:
-        path_sizes[two_level_path] += obj.size
+    path_sizes[two_level_path] += obj.size
 
 # Collect path data and print human-readable output
 path_data = []
@@ -83,59 +80,56 @@ print(f"{'=' * 60}")
 
 for path, size in sorted(path_sizes.items()):
     full_path = f"{bucket_name}/{path}"
+    size_human = format_size(size)
     path_data.append({
         'path': full_path,
         'size_bytes': size,
-        'size_mb': size / (1024 ** 2),
-        'size_gb': size / (1024 ** 3),
-        'size_human': format_size(size)
+        'size_human': size_human
     })
-    print(f"{full_path}, Size: {format_size(size)}")
+    print(f"{full_path}, Size: {size_human}")
 
-# Write CSV to memory buffer
-csv_buffer = io.StringIO()
-fieldnames = ['path', 'size_bytes', 'size_mb', 'size_gb', 'size_human']
-writer = csv.DictWriter(csv_buffer, fieldnames=fieldnames)
+# Write CSV to memory buffer, encoding as we go so there is one copy of the bytes
+csv_buffer = io.BytesIO()
+csv_text = io.TextIOWrapper(csv_buffer, encoding='utf-8', newline='', write_through=True)
+# size_mb/size_gb are derived from size_bytes by readers rather than stored
+fieldnames = ['path', 'size_bytes', 'size_human']
+writer = csv.DictWriter(csv_text, fieldnames=fieldnames)
 
 writer.writeheader()
 
 # Write bucket summary
 for bucket in bucket_data:
-    writer.writerow({
-        'path': bucket['path'],
-        'size_bytes': bucket['size_bytes'],
-        'size_mb': bucket['size_bytes'] / (1024 ** 2),
-        'size_gb': bucket['size_bytes'] / (1024 ** 3),
-        'size_human': bucket['size_human']
-    })
+    writer.writerow(bucket)
 
 # Write path details
 for path in path_data:
     writer.writerow(path)
 
+csv_text.flush()
+csv_bytes = csv_buffer.getvalue()
+
 # Calculate runtime
-end_time = time.time()
+end_time = time.monotonic()
 runtime_seconds = int(end_time - start_time)
 
 # Save locally
 csv_filename = "minio_sizes.csv"
-with open(csv_filename, 'w', newline='') as f:
-    f.write(csv_buffer.getvalue())
+with open(csv_filename, 'wb') as f:
+    f.write(csv_bytes)
 print(f"\n{'=' * 60}")
 print(f"CSV exported locally to: {csv_filename}")
 
 # Upload to MinIO with runtime in filename
-datestamp = datetime.now().strftime("%Y-%m-%d")
-timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-minio_path = f"metrics/{datestamp}_{runtime_seconds}s.csv"
-
-csv_bytes = csv_buffer.getvalue().encode('utf-8')
-csv_bytes_io = io.BytesIO(csv_bytes)
+# Reports are keyed by date (metrics/YYYY/MM/DD/) so readers can list just recent ones
+now = datetime.now()
+datestamp = now.strftime("%Y-%m-%d")
+timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+minio_path = f"metrics/{now:%Y/%m/%d}/{datestamp}_{runtime_seconds}s.csv"
 
 s3.put_object(
     bucket_name=bucket_name,
     object_name=minio_path,
-    data=csv_bytes_io,
+    data=io.BytesIO(csv_bytes),
     length=len(csv_bytes),
     content_type='text/csv'
 )
@@ -144,19 +138,21 @@ print(f"CSV uploaded to: {bucket_name}/{minio_path}")
 
 # Check for directories over quota
 QUOTA_GB = int(os.environ["QUOTA_GB"])
-over_quota = []
+quota_bytes = QUOTA_GB * 1024 ** 3
 
-for path in path_data:
+# If all the directories together fit within the quota, none of them can be over it
+if sum(path['size_bytes'] for path in path_data) > quota_bytes:
     # Skip base bucket directories
-    if '/' not in path['path']:
-        continue
+    over_quota = [{
+        'path': path['path'],
+        'size_gb': path['size_bytes'] / (1024 ** 3),
+        'size_human': path['size_human']
+    } for path in path_data if '/' in path['path'] and path['size_bytes'] > quota_bytes]
+else:
+    over_quota = []
 
-    if path['size_gb'] > QUOTA_GB:
-        over_quota.append({
-            'path': path['path'],
-            'size_gb': path['size_gb'],
-            'size_human': path['size_human']
-        })
+# Largest first, for both the printed report and the Slack message
+over_quota.sort(key=lambda x: x['size_gb'], reverse=True)
 
 # Print quota results
 print(f"\n{'=' * 60}")
@@ -165,7 +161,7 @@ print(f"{'=' * 60}")
 
 if over_quota:
     print(f"\n⚠️  {len(over_quota)} directory(s) over quota:\n")
-    for item in sorted(over_quota, key=lambda x: x['size_gb'], reverse=True):
+    for item in over_quota:
         overage = item['size_gb'] - QUOTA_GB
         print(f"  {item['path']}")
         print(f"    Size: {item['size_human']} ({overage:.2f} GB over quota)")
@@ -178,18 +174,23 @@ client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
 channel_name = "berdl_minio_notifications"
 
 try:
-    message = f"*MinIO Storage Report* - {timestamp}\n"
-    message += f"_Runtime: {runtime_seconds} seconds_\n\n"
+    lines = [
+        f"*MinIO Storage Report* - {timestamp}",
+        f"_Runtime: {runtime_seconds} seconds_",
+        "",
+    ]
 
     if over_quota:
-        message += f":warning: *{len(over_quota)} directory(s) over quota ({QUOTA_GB} GB):*\n"
-        for item in sorted(over_quota, key=lambda x: x['size_gb'], reverse=True):
-            overage = item['size_gb'] - QUOTA_GB
-            message += f"• `{item['path']}` - {item['size_human']} ({overage:.2f} GB over)\n"
+        lines.append(f":warning: *{len(over_quota)} directory(s) over quota ({QUOTA_GB} GB):*")
+        lines.extend(
+            f"• `{item['path']}` - {item['size_human']} ({item['size_gb'] - QUOTA_GB:.2f} GB over)"
+            for item in over_quota
+        )
     else:
-        message += f":white_check_mark: All directories are within the quota of {QUOTA_GB} GB."
+        lines.append(f":white_check_mark: All directories are within the quota of {QUOTA_GB} GB.")
 
-    message += f"\n\n_Metrics saved to `{bucket_name}/{minio_path}`_"
+    lines.extend(["", f"_Metrics saved to `{bucket_name}/{minio_path}`_"])
+    message = "\n".join(lines)
 
     response = client.chat_postMessage(
         channel=channel_name,
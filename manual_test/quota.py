@@ -1,8 +1,9 @@
 # This script checks the latest metrics file for directories over 100GB
+# Run it from the repository root with `python -m manual_test.quota`
 import os
 import csv
 import io
-import minio
+from minio_client import get_client
 
 required_config = ['MINIO_ROOT_USER', 'MINIO_ROOT_PASSWORD', "MINIO_ENDPOINT_URL", "SLACK_BOT_TOKEN"]
 
@@ -10,19 +11,15 @@ for var in required_config:
     if var not in os.environ:
         raise EnvironmentError(f"Required environment variable {var} not set.")
 
-s3 = minio.Minio(
-    endpoint=os.environ["MINIO_ENDPOINT_URL"].replace("http://", "").replace("https://", ""),
-    access_key=os.environ["MINIO_ROOT_USER"],
-    secret_key=os.environ["MINIO_ROOT_PASSWORD"],
-    secure=os.environ["MINIO_ENDPOINT_URL"].startswith("https://"),
-)
+
+s3 = get_client()
 
 bucket_name = "cdm-lake"
 metrics_prefix = "metrics/"
 
-# Get all CSV files in the metrics directory
+# Get all CSV files in the metrics directory, including the metrics/YYYY/MM/DD/ layout
 metrics_files = []
-for obj in s3.list_objects(bucket_name, prefix=metrics_prefix):
+for obj in s3.list_objects(bucket_name, prefix=metrics_prefix, recursive=True, use_api_v1=False):
     if obj.object_name.endswith('.csv'):
         metrics_files.append(obj)
 
@@ -54,7 +51,7 @@ for row in reader:
     if '/' not in path:
         continue
 
-    size_gb = float(row['size_gb'])
+    size_gb = int(row['size_bytes']) / (1024 ** 3)
     if size_gb > QUOTA_GB:
         over_quota.append({
             'path': path,
@@ -62,6 +59,9 @@ for row in reader:
             'size_human': row['size_human']
         })
 
+# Largest first, for both the printed report and the Slack message
+over_quota.sort(key=lambda x: x['size_gb'], reverse=True)
+
 # Print results
 print(f"\n{'=' * 60}")
 print(f"Quota check: {QUOTA_GB} GB")
@@ -69,7 +69,7 @@ print(f"{'=' * 60}")
 
 if over_quota:
     print(f"\n⚠️  {len(over_quota)} directory(s) over quota:\n")
-    for item in sorted(over_quota, key=lambda x: x['size_gb'], reverse=True):
+    for item in over_quota:
         overage = item['size_gb'] - QUOTA_GB
         print(f"  {item['path']}")
         print(f"    Size: {item['size_human']} ({overage:.2f} GB over quota)")
@@ -89,10 +89,12 @@ channel_name = "berdl_minio_notifications"
 # send a summary to slack
 try:
     if over_quota:
-        message = f":warning: *{len(over_quota)} directory(s) over quota ({QUOTA_GB} GB):*\n"
-        for item in sorted(over_quota, key=lambda x: x['size_gb'], reverse=True):
-            overage = item['size_gb'] - QUOTA_GB
-            message += f"• `{item['path']}` - {item['size_human']} ({overage:.2f} GB over quota)\n"
+        lines = [f":warning: *{len(over_quota)} directory(s) over quota ({QUOTA_GB} GB):*"]
+        lines.extend(
+            f"• `{item['path']}` - {item['size_human']} ({item['size_gb'] - QUOTA_GB:.2f} GB over quota)"
+            for item in over_quota
+        )
+        message = "\n".join(lines)
     else:
         message = f":white_check_mark: All directories are within the quota of {QUOTA_GB} GB."
 
@@ -0,0 +1,45 @@
+# Shared MinIO client setup for the report job, the web viewer and the manual tests
+import os
+from functools import lru_cache
+from urllib.parse import urlsplit
+import certifi
+import minio
+import urllib3
+from urllib3.util import Retry
+
+required_config = ['MINIO_ROOT_USER', 'MINIO_ROOT_PASSWORD', "MINIO_ENDPOINT_URL"]
+
+# Enough pooled connections for the largest worker pool of any caller
+MAX_POOL_CONNECTIONS = 32
+
+
+def parse_endpoint(url):
+    """Split an endpoint URL into the host[:port] Minio expects and whether it uses TLS."""
+    parts = urlsplit(url if "://" in url else f"//{url}")
+    return parts.netloc, parts.scheme == "https"
+
+
+@lru_cache(maxsize=1)
+def get_client():
+    """Get the shared MinIO client, creating it on first use."""
+    for var in required_config:
+        if var not in os.environ:
+            raise EnvironmentError(f"Required environment variable {var} not set.")
+
+    endpoint, secure = parse_endpoint(os.environ["MINIO_ENDPOINT_URL"])
+    http_client = urllib3.PoolManager(
+        num_pools=4,
+        maxsize=MAX_POOL_CONNECTIONS,
+        timeout=urllib3.Timeout(connect=300, read=300),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    # Minio clients are thread safe, so every caller and worker thread shares this one
+    return minio.Minio(
+        endpoint=endpoint,
+        access_key=os.environ["MINIO_ROOT_USER"],
+        secret_key=os.environ["MINIO_ROOT_PASSWORD"],
+        secure=secure,
+        http_client=http_client,
+    )
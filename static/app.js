@@ -57,9 +57,15 @@ async function loadFile(filename, btn) {
 
     const response = await fetch(`api/csv?file=${encodeURIComponent(filename)}`);
     const data = await response.json();
-    currentData = data.rows;
+    // Rows arrive as arrays in the order of data.columns; the GB/MB sizes are derived from bytes
+    currentData = data.rows.map(row => {
+        const entry = Object.fromEntries(data.columns.map((column, i) => [column, row[i]]));
+        entry.size_gb = entry.size_bytes / 1024 ** 3;
+        entry.size_mb = entry.size_bytes / 1024 ** 2;
+        return entry;
+    });
 
-    fileInfo.textContent = `Loaded: ${filename} (${data.rows.length} rows)`;
+    fileInfo.textContent = `Loaded: ${filename} (${currentData.length} rows)`;
 
     renderTable();
     updateStats();
@@ -80,11 +86,11 @@ function renderTable() {
             valA = a.path;
             valB = b.path;
         } else if (sortColumn === 1 || sortColumn === 2) {
-            valA = parseFloat(a.size_gb);
-            valB = parseFloat(b.size_gb);
+            valA = a.size_gb;
+            valB = b.size_gb;
         } else {
-            valA = parseFloat(a.size_mb);
-            valB = parseFloat(b.size_mb);
+            valA = a.size_mb;
+            valB = b.size_mb;
         }
 
         if (sortAsc) {
@@ -95,10 +101,10 @@ function renderTable() {
     });
 
     // Find max size for bar scaling
-    const maxSize = Math.max(...filtered.map(row => parseFloat(row.size_gb)));
+    const maxSize = Math.max(...filtered.map(row => row.size_gb));
 
     tableBody.innerHTML = filtered.map(row => {
-        const sizeGB = parseFloat(row.size_gb);
+        const sizeGB = row.size_gb;
         const barWidth = (sizeGB / maxSize) * 100;
         const isOverQuota = sizeGB > quotaGB && row.path.includes('/');
 
@@ -109,8 +115,8 @@ function renderTable() {
                     <span class="size-bar" style="width: ${barWidth}px"></span>
                     ${row.size_human}
                 </td>
-                <td>${parseFloat(row.size_gb).toFixed(2)}</td>
-                <td>${parseFloat(row.size_mb).toFixed(2)}</td>
+                <td>${row.size_gb.toFixed(2)}</td>
+                <td>${row.size_mb.toFixed(2)}</td>
             </tr>
         `;
     }).join('');
@@ -118,8 +124,8 @@ function renderTable() {
 
 function updateStats() {
     const dirs = currentData.filter(row => row.path.includes('/'));
-    const totalSize = dirs.reduce((sum, row) => sum + parseFloat(row.size_gb), 0);
-    const overQuota = dirs.filter(row => parseFloat(row.size_gb) > quotaGB).length;
+    const totalSize = dirs.reduce((sum, row) => sum + row.size_gb, 0);
+    const overQuota = dirs.filter(row => row.size_gb > quotaGB).length;
 
     totalDirsEl.textContent = dirs.length;
     totalSizeEl.textContent = totalSize.toFixed(2) + ' GB';